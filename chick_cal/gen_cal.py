@@ -1,579 +1,450 @@
-from datetime import timedelta
-from typing import Optional, List, overload, Union
-from enum import Enum
+import os
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Final, Iterable, Iterator, NamedTuple, List, Sequence, TextIO
+from functools import lru_cache
+from heapq import merge
+from zoneinfo import ZoneInfo
 
-import arrow
-from ics import Calendar, Event
-from ics.alarm.base import BaseAlarm
-from ics.alarm import DisplayAlarm
-
-CLASS_TYPES = {0: "Workshop", 1: "01 Lecture", 2: "02 Tutorial"}
 TZ = "Asia/Singapore"
 SEM_PREFIX = r"CU_TRI323_FT"
+SGT = ZoneInfo(TZ)
+PRODID = "-//khzaw//chick-cal//EN"
 
-class ClassType(Enum):
-    WORKSHOP = '0'
-    LEC = '01 Lecture'
-    TUT = '02 Tutorial'
-
-
-def gen_name(code: str, idx: int, ct: ClassType) -> str:
-    PREFIX = f"{SEM_PREFIX}_{code}_S{idx:02}_"
-    if ct == ClassType.LEC:
-        return PREFIX + "Lec/1"
-    elif ct == ClassType.TUT:
-        if code.startswith("MI"):
-            return PREFIX + "Tut_B"
-        if code.startswith("ECS2"):
-            return PREFIX.rstrip("_") + "A Tut A"
-        return PREFIX + "Tut/1"
-    else:
-        return PREFIX + "Workshop"
+# Class types, as used in session names and descriptions.
+CT_WORKSHOP = "0"
+CT_LEC = "01 Lecture"
+CT_TUT = "02 Tutorial"
 
 
-@overload
-def gen_event(
-        name: str,
-        desc: str,
-        start_time: arrow.Arrow,
-        all_day: bool = False,
-        duration: int = 3,
-        location: str = "Main Wing",
-        class_type: ClassType = ClassType.LEC,
-        alarms: Optional[List[BaseAlarm]] = None) -> Event:
-    ...
-
-@overload
-def gen_event(
-        name: str,
-        desc: str,
-        start_time: arrow.Arrow,
-        all_day: bool = False,
-        duration: int = 3,
-        location: str = "Main Wing",
-        class_type: int = 0,
-        alarms: Optional[List[BaseAlarm]] = None) -> Event:
-    ...
+class Event(NamedTuple):
+    name: str
+    begin: datetime | date  # a plain date for all-day events
+    duration: timedelta | None  # None for all-day events
+    description: str
+    location: str
+    alarms: tuple[timedelta, ...]
+
+
+# A calendar is just its events, in insertion order.
+Calendar = List[Event]
+
+_PDF_URL = "https://www.psb-academy.edu.sg/wordpress/wp-content/uploads/2020/11/Tri-223-CU_FTBArts-BM-223_Term-1-Timetable.pdf"
+_DEFAULT_HOURS = 3
+_DEFAULT_LOCATION = "Main Wing"
+_DEFAULT_ALARMS = (timedelta(hours=-1),)
+_DUE_DATE_ALARMS = (timedelta(days=-7), timedelta(days=-3), timedelta(days=-1))
+_DURATION_CACHE = {h: timedelta(hours=h) for h in range(1, 13)}
+
+
+_SUFFIX_TABLE = {CT_LEC: "_Lec/1", CT_WORKSHOP: "_Workshop"}
+# Tutorial names vary by course; first matching code prefix wins.
+_TUT_SUFFIXES = (("MI", "_Tut_B"), ("ECS2", "A Tut A"))
+_TUT_DEFAULT = "_Tut/1"
+
+
+def _name_suffix(code: str, ct: str) -> str:
+    if ct != CT_TUT:
+        # Anything that is not a lecture or tutorial is named like a workshop.
+        return _SUFFIX_TABLE.get(ct, "_Workshop")
+    for prefix, suffix in _TUT_SUFFIXES:
+        if code.startswith(prefix):
+            return suffix
+    return _TUT_DEFAULT
+
+
+@lru_cache(maxsize=256)
+def gen_name(code: str, idx: int, ct: str) -> str:
+    return "%s_%s_S%02d%s" % (SEM_PREFIX, code, idx, _name_suffix(code, ct))
+
+
+@lru_cache(maxsize=256)
+def _escape(text: str) -> str:
+    return (
+        text.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\n", "\\n")
+    )
+
+
+@lru_cache(maxsize=512)
+def _fmt_utc_dtstart(dt: datetime) -> str:
+    # Aware datetimes hash by UTC instant, which is exactly what this output
+    # depends on, so caching here is safe.
+    return dt.astimezone(timezone.utc).strftime("DTSTART:%Y%m%dT%H%M%SZ\r\n")
+
+
+def _fmt_dtstart(dt: datetime | date, all_day: bool) -> str:
+    if isinstance(dt, datetime):
+        if not all_day:
+            return _fmt_utc_dtstart(dt)
+        # The local calendar date, not the UTC one. Not cached: equal
+        # instants in different zones can fall on different dates.
+        dt = dt.date()
+    return dt.strftime("DTSTART;VALUE=DATE:%Y%m%d\r\n")
+
+
+@lru_cache(maxsize=None)
+def _fmt_duration(td: timedelta) -> str:
+    """Format ``td`` as an RFC 5545 DURATION value, e.g. ``-PT1H`` or ``-P7D``."""
+    sign = "-" if td < timedelta(0) else ""
+    td = abs(td)
+    out = sign + "P"
+    if td.days:
+        out += f"{td.days}D"
+    if td.seconds or not td.days:
+        h, rem = divmod(td.seconds, 3600)
+        m, sec = divmod(rem, 60)
+        out += "T"
+        if h:
+            out += f"{h}H"
+        if m:
+            out += f"{m}M"
+        if sec or not (h or m):
+            out += f"{sec}S"
+    return out
+
+
+@lru_cache(maxsize=None)
+def _build_desc(desc: str, class_type: str) -> str:
+    # Only a couple of (lecturer, class type) pairs per course, so build each once.
+    return desc + "\n" + class_type
 
 
 def gen_event(
     name: str,
     desc: str,
-    start_time: arrow.Arrow,
+    start_time: datetime | date,
     all_day: bool = False,
-    duration: int = 3,
-    location: str = "Main Wing",
-    class_type: ClassType | int = ClassType.LEC,
-    alarms: List[BaseAlarm] | None = None,
+    duration: int = _DEFAULT_HOURS,
+    location: str = _DEFAULT_LOCATION,
+    class_type: str = CT_LEC,
+    alarms: Sequence[timedelta] = _DEFAULT_ALARMS,
 ) -> Event:
-    e = Event()
-    e.name = name
-    e.begin = start_time
-    if not all_day:
-        e.duration = timedelta(hours=duration)
-    else:
-        e.make_all_day()
-        # e.all_day = True
-
-    if isinstance(class_type, ClassType):
-        e.description = desc + "\n" + class_type.value
-    else:
-        e.description = desc + "\n" + CLASS_TYPES.get(class_type, "")
-    e.location = location
-    e.url = "https://www.psb-academy.edu.sg/wordpress/wp-content/uploads/2020/11/Tri-223-CU_FTBArts-BM-223_Term-1-Timetable.pdf"
-    e.alarms = alarms if alarms is not None else [DisplayAlarm(trigger=timedelta(hours=-1))]
-    return e
-
-
-def gen_mi(c: Calendar):
-    CODE, l, START_DATE = (
-        "MI(2007MK)",
-        "Frank Boey Chong King",
-        arrow.get(2023, 7, 24, tzinfo="Asia/Singapore").replace(hour=15, minute=30),
+    # A bare date already says the event is all-day.
+    all_day = all_day or not isinstance(start_time, datetime)
+    return Event(
+        name=name,
+        begin=start_time,
+        duration=(
+            None if all_day else _DURATION_CACHE.get(duration) or timedelta(hours=duration)
+        ),
+        description=_build_desc(desc, class_type),
+        location=location,
+        alarms=tuple(alarms),  # no copy when already a tuple
     )
 
-    c.events.add(
-        gen_event(
-            name=gen_name(CODE, 1, ClassType.LEC),
-            desc=l,
-            start_time=START_DATE.replace(day=25),
-            class_type=1,
-        )
-    )
-    c.events.add(
-        gen_event(
-            name=gen_name(CODE, 2, ClassType.LEC),
-            desc=l,
-            start_time=START_DATE.replace(day=1, month=8),
-            class_type=1,
-        )
-    )
-    c.events.add(
-        gen_event(
-            name=gen_name(CODE, 3, ClassType.TUT),
-            desc=l,
-            start_time=START_DATE.replace(day=8, month=8),
-            class_type=2,
-        )
-    )
-    c.events.add(
-        gen_event(
-            name=gen_name(CODE, 4, ClassType.LEC),
-            desc=l,
-            start_time=START_DATE.replace(day=14, month=8, hour=12, minute=0),
-            class_type=1,
-        )
-    )
-    c.events.add(
-        gen_event(
-            name=gen_name(CODE, 5, ClassType.TUT),
-            desc=l,
-            start_time=START_DATE.replace(day=15, month=8),
-            class_type=2,
-        )
-    )
-    c.events.add(
-        gen_event(
-            name=gen_name(CODE, 6, ClassType.LEC),
-            desc=l,
-            start_time=START_DATE.replace(day=21, month=8, hour=12, minute=0),
-            class_type=1,
-        )
-    )
-    c.events.add(
-        gen_event(
-            name=gen_name(CODE, 7, ClassType.TUT),
-            desc=l,
-            start_time=START_DATE.replace(day=22, month=8),
-            class_type=2,
-        )
-    )
-    c.events.add(
-        gen_event(
-            name=gen_name(CODE, 8, ClassType.LEC),
-            desc=l,
-            start_time=START_DATE.replace(day=29, month=8),
-            class_type=1,
-        )
-    )
-    c.events.add(
-        gen_event(
-            name=gen_name(CODE, 9, ClassType.TUT),
-            desc=l,
-            start_time=START_DATE.replace(day=5, month=9),
-            class_type=2,
-        )
-    )
-    c.events.add(
-        gen_event(
-            name=gen_name(CODE, 10, ClassType.LEC),
-            desc=l,
-            start_time=START_DATE.replace(day=12, month=9),
-            class_type=1,
-        )
-    )
-    c.events.add(
-        gen_event(
-            name=gen_name(CODE, 11, ClassType.TUT),
-            desc=l,
-            start_time=START_DATE.replace(day=19, month=9),
-            class_type=2,
-        )
-    )
-    c.events.add(
-        gen_event(
-            name=gen_name(CODE, 12, ClassType.LEC),
-            desc=l,
-            start_time=START_DATE.replace(day=26, month=9),
-            class_type=1,
-        )
-    )
-    c.events.add(
-        gen_event(
-            name=gen_name(CODE, 13, ClassType.TUT),
-            desc=l,
-            start_time=START_DATE.replace(day=3, month=10),
-            class_type=2,
-        )
-    )
-    c.events.add(
-        gen_event(
-            name=gen_name(CODE, 14, ClassType.LEC),
-            desc=l,
-            start_time=START_DATE.replace(day=10, month=10),
-            class_type=1,
-        )
-    )
-    return c
 
-def gen_mlm(c: Calendar) -> Calendar:
-    CODE, l, START_DATE = (
-        "MLM(2000HR)",
-        "Salitha Nair",
-        arrow.get(2023, 7, 28, tzinfo="Asia/Singapore").replace(hour=12),
-    )
-    c.events.add(
-        gen_event(
-            name=gen_name(CODE, 1, ClassType.LEC), desc=l, start_time=START_DATE, class_type=1
-        )
-    )
-    c.events.add(
-        gen_event(
-            name=gen_name(CODE, 2, ClassType.LEC),
-            desc=l,
-            start_time=START_DATE.replace(day=2, month=8),
-            class_type=1,
-        )
-    )
-    c.events.add(
-        gen_event(
-            name=gen_name(CODE, 3, ClassType.LEC),
-            desc=l,
-            start_time=START_DATE.replace(day=11, month=8),
-            class_type=2,
-        )
-    )
-    c.events.add(
-        gen_event(
-            name=gen_name(CODE, 4, ClassType.LEC),
-            desc=l,
-            start_time=START_DATE.replace(day=16, month=8, hour=12, minute=0),
-            class_type=1,
-        )
-    )
-    c.events.add(
-        gen_event(
-            name=gen_name(CODE, 5, ClassType.LEC),
-            desc=l,
-            start_time=START_DATE.replace(day=23, month=8),
-            class_type=2,
-        )
-    )
-    c.events.add(
-        gen_event(
-            name=gen_name(CODE, 6, ClassType.LEC),
-            desc=l,
-            start_time=START_DATE.replace(day=28, month=8, hour=12, minute=0),
-            class_type=1,
-        )
+def _session_event(name: str, start_time: datetime, description: str) -> Event:
+    # Timetable sessions always use gen_event's defaults, so skip its argument
+    # handling and build the record directly.
+    return Event(
+        name,
+        start_time,
+        _DURATION_CACHE[_DEFAULT_HOURS],
+        description,
+        _DEFAULT_LOCATION,
+        _DEFAULT_ALARMS,
     )
-    c.events.add(
-        gen_event(
-            name=gen_name(CODE, 7, ClassType.TUT),
-            desc=l,
-            start_time=START_DATE.replace(day=30, month=8),
-            class_type=2,
-        )
-    )
-    c.events.add(
-        gen_event(
-            name=gen_name(CODE, 8, ClassType.LEC),
-            desc=l,
-            start_time=START_DATE.replace(day=6, month=9),
-            class_type=1,
-        )
-    )
-    c.events.add(
-        gen_event(
-            name=gen_name(CODE, 9, ClassType.TUT),
-            desc=l,
-            start_time=START_DATE.replace(day=8, month=9),
-            class_type=2,
-        )
-    )
-    c.events.add(
-        gen_event(
-            name=gen_name(CODE, 10, ClassType.LEC),
-            desc=l,
-            start_time=START_DATE.replace(day=13, month=9),
-            class_type=1,
-        )
-    )
-    c.events.add(
-        gen_event(
-            name=gen_name(CODE, 11, ClassType.TUT),
-            desc=l,
-            start_time=START_DATE.replace(day=20, month=9),
-            class_type=2,
-        )
-    )
-    c.events.add(
-        gen_event(
-            name=gen_name(CODE, 12, ClassType.LEC),
-            desc=l,
-            start_time=START_DATE.replace(day=27, month=9),
-            class_type=1,
-        )
-    )
-    c.events.add(
-        gen_event(
-            name=gen_name(CODE, 13, ClassType.TUT),
-            desc=l,
-            start_time=START_DATE.replace(day=4, month=10),
-            class_type=2,
-        )
-    )
-    c.events.add(
-        gen_event(
-            name=gen_name(CODE, 14, ClassType.LEC),
-            desc=l,
-            start_time=START_DATE.replace(day=11, month=10),
-            class_type=1,
-        )
-    )
-    return c
 
-def gen_db(c: Calendar) -> Calendar:
-    CODE, l, START_DATE = (
-        "DB(2009MK)",
-        "Cheng Biqing Christopher",
-        arrow.get(2023, 7, 27, tzinfo="Asia/Singapore").replace(hour=15, minute=30),
-    )
-    c.events.add(
-        gen_event(
-            name=gen_name(CODE, 1, ClassType.LEC), desc=l, start_time=START_DATE, class_type=1
-        )
-    )
-    c.events.add(
-        gen_event(
-            name=gen_name(CODE, 2, ClassType.LEC),
-            desc=l,
-            start_time=START_DATE.replace(day=3, month=8),
-            class_type=1,
-        )
-    )
-    c.events.add(
-        gen_event(
-            name=gen_name(CODE, 3, ClassType.TUT),
-            desc=l,
-            start_time=START_DATE.replace(day=7, month=8, hour=12, minute=0),
-            class_type=2,
-        )
-    )
-    c.events.add(
-        gen_event(
-            name=gen_name(CODE, 4, ClassType.LEC),
-            desc=l,
-            start_time=START_DATE.replace(day=10, month=8),
-            class_type=1,
-        )
-    )
-    c.events.add(
-        gen_event(
-            name=gen_name(CODE, 5, ClassType.TUT),
-            desc=l,
-            start_time=START_DATE.replace(day=17, month=8),
-            class_type=2,
-        )
-    )
-    c.events.add(
-        gen_event(
-            name=gen_name(CODE, 6, ClassType.LEC),
-            desc=l,
-            start_time=START_DATE.replace(day=24, month=8),
-            class_type=1,
-        )
-    )
-    c.events.add(
-        gen_event(
-            name=gen_name(CODE, 7, ClassType.TUT),
-            desc=l,
-            start_time=START_DATE.replace(day=31, month=8),
-            class_type=2,
-        )
-    )
-    c.events.add(
-        gen_event(
-            name=gen_name(CODE, 8, ClassType.LEC),
-            desc=l,
-            start_time=START_DATE.replace(day=4, month=9, hour=12, minute=0),
-            class_type=1,
-        )
-    )
-    c.events.add(
-        gen_event(
-            name=gen_name(CODE, 9, ClassType.TUT),
-            desc=l,
-            start_time=START_DATE.replace(day=7, month=9),
-            class_type=2,
-        )
-    )
-    c.events.add(
-        gen_event(
-            name=gen_name(CODE, 10, ClassType.LEC),
-            desc=l,
-            start_time=START_DATE.replace(day=14, month=9),
-            class_type=1,
-        )
-    )
-    c.events.add(
-        gen_event(
-            name=gen_name(CODE, 11, ClassType.TUT),
-            desc=l,
-            start_time=START_DATE.replace(day=21, month=9),
-            class_type=2,
-        )
-    )
-    c.events.add(
-        gen_event(
-            name=gen_name(CODE, 12, ClassType.LEC),
-            desc=l,
-            start_time=START_DATE.replace(day=28, month=9),
-            class_type=1,
-        )
-    )
-    c.events.add(
-        gen_event(
-            name=gen_name(CODE, 13, ClassType.TUT),
-            desc=l,
-            start_time=START_DATE.replace(day=5, month=10),
-            class_type=2,
-        )
-    )
-    c.events.add(
-        gen_event(
-            name=gen_name(CODE, 14, ClassType.LEC),
-            desc=l,
-            start_time=START_DATE.replace(day=12, month=10),
-            class_type=1,
-        )
-    )
-    return c
 
-def gen_mm(c: Calendar) -> Calendar:
-    CODE, l, START_DATE = (
-        "MM(5010MKT)",
-        "Ng Siah Heng",
-        arrow.get(2023, 11, 20, tzinfo=TZ).replace(hour=12),
-    )
+_EVENT_TMPL = (
+    "BEGIN:VEVENT\r\n"
+    "UID:{uid}\r\n"
+    "{when}"
+    "SUMMARY:{name}\r\n"
+    "DESCRIPTION:{description}\r\n"
+    "{location}"
+    f"URL:{_PDF_URL}\r\n"  # the same for every event, so fixed in the template
+    "{alarms}"
+    "END:VEVENT\r\n"
+)
+_ALARM_TMPL = (
+    "BEGIN:VALARM\r\n"
+    "ACTION:DISPLAY\r\n"
+    "DESCRIPTION:\r\n"
+    "TRIGGER:{trigger}\r\n"
+    "END:VALARM\r\n"
+)
 
-    c.events.add(
-        gen_event(
-            name=gen_name(CODE, 1, ClassType.LEC),
-            desc=l,
-            start_time=START_DATE,
-            class_type=ClassType.LEC
-        )
-    )
 
-def gen_workshops(c: Calendar) -> Calendar:
-    START_DATE = arrow.get(2023, 7, 24, tzinfo="Asia/Singapore").replace(
-        hour=15, minute=30
-    )
-    c.events.add(
-        gen_event(
-            name="CU Referencing Workshop",
-            desc="Dr Ng Jia Yun Florence",
-            start_time=START_DATE,
-            duration=3,
-        )
-    )
-    c.events.add(
-        gen_event(
-            name="GNet",
-            desc="",
-            start_time=START_DATE.replace(day=31, month=7, hour=10, minute=0),
-            duration=2,
-        )
-    )
-    c.events.add(
-        gen_event(
-            name="Marketing Intensive Workshop",
-            desc="Dr Liow Li Sa Melissa",
-            start_time=START_DATE.replace(day=12, month=8, hour=9, minute=0),
-            duration=9,
-        )
+@lru_cache(maxsize=None)
+def _fmt_alarms(alarms: tuple[timedelta, ...]) -> str:
+    return "".join([_ALARM_TMPL.format(trigger=_fmt_duration(t)) for t in alarms])
+
+
+def _format_event(e: Event) -> str:
+    if e.duration is None:
+        when = _fmt_dtstart(e.begin, True)
+    else:
+        when = _fmt_dtstart(e.begin, False) + f"DURATION:{_fmt_duration(e.duration)}\r\n"
+    name = _escape(e.name)
+    return _EVENT_TMPL.format(
+        # Every event name is unique (sessions carry their course code and
+        # index), so the name alone identifies the event: its UID survives
+        # reschedules, and re-importing updates it in place.
+        uid=f"{name}@chick-cal",
+        when=when,
+        name=name,
+        description=_escape(e.description),
+        location=f"LOCATION:{_escape(e.location)}\r\n" if e.location else "",
+        alarms=_fmt_alarms(e.alarms),
     )
-    return c
 
-def gen_duedates(c: Calendar) -> Calendar:
-    c.events.add(
-        gen_event(
-            name="Marketing Insight CW1 Due",
-            desc="",
-            location="",
-            start_time=arrow.get(2023, 8, 29, tzinfo="Asia/Singapore"),
-            all_day=True,
-            alarms=[
-                DisplayAlarm(trigger=timedelta(days=-7)),
-                DisplayAlarm(trigger=timedelta(days=-3)),
-                DisplayAlarm(trigger=timedelta(days=-1)),
-            ],
-        )
+
+_CAL_HEADER = f"BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:{PRODID}\r\n"
+_CAL_FOOTER = "END:VCALENDAR\r\n"
+
+
+def iter_ics(c: Iterable[Event]) -> Iterator[str]:
+    """Yield the calendar text: the header, one block per VEVENT, then the footer.
+
+    ``c`` is consumed lazily, so it can be a generator of events.
+    """
+    yield _CAL_HEADER
+    for e in c:
+        yield _format_event(e)
+    yield _CAL_FOOTER
+
+
+def serialize(c: Iterable[Event]) -> str:
+    return "".join(iter_ics(c))
+
+
+def write_calendar(f: TextIO, c: Iterable[Event]) -> None:
+    """Write ``c`` to ``f`` one VEVENT at a time, without building the whole file.
+
+    Open ``f`` with ``newline=""`` so the CRLF line endings are kept as is.
+    """
+    f.writelines(iter_ics(c))
+
+
+# (session idx, CT_* type for the session name, CT_* type for the description, start)
+Schedule = tuple[tuple[int, str, str, datetime], ...]
+
+_MI_SCHEDULE: Final[Schedule] = (
+    (1, CT_LEC, CT_LEC, datetime(2023, 7, 25, 15, 30, tzinfo=SGT)),
+    (2, CT_LEC, CT_LEC, datetime(2023, 8, 1, 15, 30, tzinfo=SGT)),
+    (3, CT_TUT, CT_TUT, datetime(2023, 8, 8, 15, 30, tzinfo=SGT)),
+    (4, CT_LEC, CT_LEC, datetime(2023, 8, 14, 12, 0, tzinfo=SGT)),
+    (5, CT_TUT, CT_TUT, datetime(2023, 8, 15, 15, 30, tzinfo=SGT)),
+    (6, CT_LEC, CT_LEC, datetime(2023, 8, 21, 12, 0, tzinfo=SGT)),
+    (7, CT_TUT, CT_TUT, datetime(2023, 8, 22, 15, 30, tzinfo=SGT)),
+    (8, CT_LEC, CT_LEC, datetime(2023, 8, 29, 15, 30, tzinfo=SGT)),
+    (9, CT_TUT, CT_TUT, datetime(2023, 9, 5, 15, 30, tzinfo=SGT)),
+    (10, CT_LEC, CT_LEC, datetime(2023, 9, 12, 15, 30, tzinfo=SGT)),
+    (11, CT_TUT, CT_TUT, datetime(2023, 9, 19, 15, 30, tzinfo=SGT)),
+    (12, CT_LEC, CT_LEC, datetime(2023, 9, 26, 15, 30, tzinfo=SGT)),
+    (13, CT_TUT, CT_TUT, datetime(2023, 10, 3, 15, 30, tzinfo=SGT)),
+    (14, CT_LEC, CT_LEC, datetime(2023, 10, 10, 15, 30, tzinfo=SGT)),
+)
+
+_MLM_SCHEDULE: Final[Schedule] = (
+    (1, CT_LEC, CT_LEC, datetime(2023, 7, 28, 12, 0, tzinfo=SGT)),
+    (2, CT_LEC, CT_LEC, datetime(2023, 8, 2, 12, 0, tzinfo=SGT)),
+    (3, CT_LEC, CT_TUT, datetime(2023, 8, 11, 12, 0, tzinfo=SGT)),
+    (4, CT_LEC, CT_LEC, datetime(2023, 8, 16, 12, 0, tzinfo=SGT)),
+    (5, CT_LEC, CT_TUT, datetime(2023, 8, 23, 12, 0, tzinfo=SGT)),
+    (6, CT_LEC, CT_LEC, datetime(2023, 8, 28, 12, 0, tzinfo=SGT)),
+    (7, CT_TUT, CT_TUT, datetime(2023, 8, 30, 12, 0, tzinfo=SGT)),
+    (8, CT_LEC, CT_LEC, datetime(2023, 9, 6, 12, 0, tzinfo=SGT)),
+    (9, CT_TUT, CT_TUT, datetime(2023, 9, 8, 12, 0, tzinfo=SGT)),
+    (10, CT_LEC, CT_LEC, datetime(2023, 9, 13, 12, 0, tzinfo=SGT)),
+    (11, CT_TUT, CT_TUT, datetime(2023, 9, 20, 12, 0, tzinfo=SGT)),
+    (12, CT_LEC, CT_LEC, datetime(2023, 9, 27, 12, 0, tzinfo=SGT)),
+    (13, CT_TUT, CT_TUT, datetime(2023, 10, 4, 12, 0, tzinfo=SGT)),
+    (14, CT_LEC, CT_LEC, datetime(2023, 10, 11, 12, 0, tzinfo=SGT)),
+)
+
+_DB_SCHEDULE: Final[Schedule] = (
+    (1, CT_LEC, CT_LEC, datetime(2023, 7, 27, 15, 30, tzinfo=SGT)),
+    (2, CT_LEC, CT_LEC, datetime(2023, 8, 3, 15, 30, tzinfo=SGT)),
+    (3, CT_TUT, CT_TUT, datetime(2023, 8, 7, 12, 0, tzinfo=SGT)),
+    (4, CT_LEC, CT_LEC, datetime(2023, 8, 10, 15, 30, tzinfo=SGT)),
+    (5, CT_TUT, CT_TUT, datetime(2023, 8, 17, 15, 30, tzinfo=SGT)),
+    (6, CT_LEC, CT_LEC, datetime(2023, 8, 24, 15, 30, tzinfo=SGT)),
+    (7, CT_TUT, CT_TUT, datetime(2023, 8, 31, 15, 30, tzinfo=SGT)),
+    (8, CT_LEC, CT_LEC, datetime(2023, 9, 4, 12, 0, tzinfo=SGT)),
+    (9, CT_TUT, CT_TUT, datetime(2023, 9, 7, 15, 30, tzinfo=SGT)),
+    (10, CT_LEC, CT_LEC, datetime(2023, 9, 14, 15, 30, tzinfo=SGT)),
+    (11, CT_TUT, CT_TUT, datetime(2023, 9, 21, 15, 30, tzinfo=SGT)),
+    (12, CT_LEC, CT_LEC, datetime(2023, 9, 28, 15, 30, tzinfo=SGT)),
+    (13, CT_TUT, CT_TUT, datetime(2023, 10, 5, 15, 30, tzinfo=SGT)),
+    (14, CT_LEC, CT_LEC, datetime(2023, 10, 12, 15, 30, tzinfo=SGT)),
+)
+
+_MM_SCHEDULE: Final[Schedule] = (
+    (1, CT_LEC, CT_LEC, datetime(2023, 11, 20, 12, 0, tzinfo=SGT)),
+)
+
+
+COURSES = (
+    ("MI(2007MK)", "Frank Boey Chong King", _MI_SCHEDULE),
+    ("MLM(2000HR)", "Salitha Nair", _MLM_SCHEDULE),
+    ("DB(2009MK)", "Cheng Biqing Christopher", _DB_SCHEDULE),
+)
+
+# All course sessions, merged and sorted by start time once. Descriptions are
+# built here as well, so gen_courses() never has to.
+_SESSIONS = sorted(
+    (
+        (code, idx, ct, _build_desc(lecturer, class_type), start_time)
+        for code, lecturer, schedule in COURSES
+        for idx, ct, class_type, start_time in schedule
+    ),
+    key=lambda row: row[-1],
+)
+
+
+# The per-table generators build events lazily, so write_calendar() can format
+# each one as soon as it is made.
+def gen_course(code: str, lecturer: str, schedule: Schedule) -> Iterator[Event]:
+    return (
+        _session_event(gen_name(code, idx, ct), start_time, _build_desc(lecturer, class_type))
+        for idx, ct, class_type, start_time in schedule
     )
-    c.events.add(
-        gen_event(
-            name="Marketing Insight CW2 Due",
-            desc="",
-            location="",
-            start_time=arrow.get(2023, 10, 15, tzinfo="Asia/Singapore"),
-            all_day=True,
-            alarms=[
-                DisplayAlarm(trigger=timedelta(days=-7)),
-                DisplayAlarm(trigger=timedelta(days=-3)),
-                DisplayAlarm(trigger=timedelta(days=-1)),
-            ],
-        )
+
+def gen_courses() -> Iterator[Event]:
+    return (
+        _session_event(gen_name(code, idx, ct), start_time, description)
+        for code, idx, ct, description, start_time in _SESSIONS
     )
-    c.events.add(
-        gen_event(
-            name="Management and Leadership in Marketing CW Due",
-            desc="",
-            location="",
-            start_time=arrow.get(2023, 10, 12, tzinfo="Asia/Singapore"),
-            all_day=True,
-            alarms=[
-                DisplayAlarm(trigger=timedelta(days=-7)),
-                DisplayAlarm(trigger=timedelta(days=-3)),
-                DisplayAlarm(trigger=timedelta(days=-1)),
-            ],
-        )
+
+def gen_mm() -> Iterator[Event]:
+    return gen_course("MM(5010MKT)", "Ng Siah Heng", _MM_SCHEDULE)
+
+
+# (name, presenter, start, duration in hours), sorted by start like _SESSIONS.
+_WORKSHOPS = sorted(
+    (
+        (
+            "CU Referencing Workshop",
+            "Dr Ng Jia Yun Florence",
+            datetime(2023, 7, 24, 15, 30, tzinfo=SGT),
+            3,
+        ),
+        ("GNet", "", datetime(2023, 7, 31, 10, 0, tzinfo=SGT), 2),
+        (
+            "Marketing Intensive Workshop",
+            "Dr Liow Li Sa Melissa",
+            datetime(2023, 8, 12, 9, 0, tzinfo=SGT),
+            9,
+        ),
+    ),
+    key=lambda row: row[2],
+)
+
+# (name, due date), sorted by date.
+_DUE_DATES = sorted(
+    (
+        ("Marketing Insight CW1 Due", date(2023, 8, 29)),
+        ("Marketing Insight CW2 Due", date(2023, 10, 15)),
+        ("Management and Leadership in Marketing CW Due", date(2023, 10, 12)),
+        ("Digital Business CW1 Due", date(2023, 9, 12)),
+        ("Digital Business CW2 Due", date(2023, 10, 4)),
+    ),
+    key=lambda row: row[1],
+)
+
+
+def gen_workshops() -> Iterator[Event]:
+    return (
+        gen_event(name=name, desc=desc, start_time=start_time, duration=duration)
+        for name, desc, start_time, duration in _WORKSHOPS
     )
-    c.events.add(
+
+def gen_duedates() -> Iterator[Event]:
+    return (
         gen_event(
-            name="Digital Business CW1 Due",
+            name=name,
             desc="",
             location="",
-            start_time=arrow.get(2023, 9, 12, tzinfo="Asia/Singapore"),
-            all_day=True,
-            alarms=[
-                DisplayAlarm(trigger=timedelta(days=-7)),
-                DisplayAlarm(trigger=timedelta(days=-3)),
-                DisplayAlarm(trigger=timedelta(days=-1)),
-            ],
+            start_time=start_time,
+            alarms=_DUE_DATE_ALARMS,
         )
+        for name, start_time in _DUE_DATES
     )
-    c.events.add(
-        gen_event(
-            name="Digital Business CW2 Due",
-            desc="",
-            location="",
-            start_time=arrow.get(2023, 10, 4, tzinfo="Asia/Singapore"),
-            all_day=True,
-            alarms=[
-                DisplayAlarm(trigger=timedelta(days=-7)),
-                DisplayAlarm(trigger=timedelta(days=-3)),
-                DisplayAlarm(trigger=timedelta(days=-1)),
-            ],
-        )
+
+def _start_key(e: Event) -> datetime:
+    # All-day events begin on a plain date; order them from local midnight.
+    if isinstance(e.begin, datetime):
+        return e.begin
+    return datetime(e.begin.year, e.begin.month, e.begin.day, tzinfo=SGT)
+
+def iter_first_sem() -> Iterator[Event]:
+    # Each table is already sorted, so merging them lazily keeps the whole
+    # calendar in chronological order without building it first.
+    return merge(
+        gen_workshops(),
+        gen_courses(),  # MI(2007MK), MLM(2000HR), DB(2009MK)
+        gen_duedates(),
+        key=_start_key,
     )
-    return c
+
+def iter_second_sem() -> Iterator[Event]:
+    return gen_mm()  # MM(5010MKT)
 
 def gen_first_sem() -> Calendar:
-    c = Calendar()
-    gen_workshops(c)
-    gen_mi(c)  # MI(2007MK)
-    gen_mlm(c)  # MLM(2000HR)
-    gen_db(c)  # DB(2009MK)
-    gen_duedates(c)
-    return c
+    return list(iter_first_sem())
 
 def gen_second_sem() -> Calendar:
-    c = Calendar()
-    gen_mm(c) # MM(5010MKT)
+    return list(iter_second_sem())
+
+
+@lru_cache(maxsize=None)
+def serialize_cal(gen: Callable[[], Calendar] = gen_second_sem) -> bytes:
+    # Every input is a literal, so the encoded calendar is a constant per semester.
+    return serialize(gen()).encode()
+
+
+# Optional snapshot of serialize_cal() for both semesters, written by
+# `--prebuild` so later runs only have to copy bytes to disk.
+_PREBUILT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "_prebuilt.py")
+
+
+def write_prebuilt(path: str = _PREBUILT) -> None:
+    with open(path, "w") as f:
+        f.write(
+            "# Generated by `gen_cal.py --prebuild`; do not edit.\n"
+            f"FIRST_SEM_ICS = {serialize_cal(gen_first_sem)!r}\n"
+            f"SECOND_SEM_ICS = {serialize_cal(gen_second_sem)!r}\n"
+        )
+
+
+def load_prebuilt(name: str, path: str = _PREBUILT) -> bytes | None:
+    # A snapshot older than this file may not match the schedules any more.
+    if not os.path.exists(path) or os.path.getmtime(path) < os.path.getmtime(__file__):
+        return None
+    import importlib.util
+
+    spec = importlib.util.spec_from_file_location("chick_cal._prebuilt", path)
+    if spec is None or spec.loader is None:
+        return None
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    ics = getattr(mod, name, None)
+    return ics if isinstance(ics, bytes) else None
+
+
+# Big enough that the whole calendar reaches the OS in one or two writes.
+_WRITE_BUFFER = 1 << 16
 
 
 if __name__ == "__main__":
-    c = gen_second_sem()
-    with open("psb.ics", "w") as f:
-        f.writelines(c.serialize_iter())
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Write the PSB timetable to psb.ics.")
+    parser.add_argument(
+        "--prebuild",
+        action="store_true",
+        help="snapshot both semesters' ICS bytes into chick_cal/_prebuilt.py instead",
+    )
+    args = parser.parse_args()
+    if args.prebuild:
+        write_prebuilt()
+    elif (ics := load_prebuilt("SECOND_SEM_ICS")) is not None:
+        with open("psb.ics", "wb", buffering=_WRITE_BUFFER) as f:
+            f.write(ics)
+    else:
+        with open("psb.ics", "w", buffering=_WRITE_BUFFER, encoding="utf-8", newline="") as f:
+            write_calendar(f, iter_second_sem())
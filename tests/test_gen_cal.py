@@ -0,0 +1,90 @@
+"""Pin gen_cal's ICS output so refactors cannot silently change psb.ics.
+
+The golden files were checked field by field against the old ics-library
+build; the only intended difference is that all-day due dates use the local
+date. After a deliberate schedule or format change, regenerate them with
+
+    python -m tests.test_gen_cal regen
+"""
+import os
+import sys
+import unittest
+from datetime import date, datetime, timedelta, timezone
+
+from chick_cal import gen_cal
+
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden")
+GOLDEN = {
+    "first_sem.ics": gen_cal.gen_first_sem,
+    "second_sem.ics": gen_cal.gen_second_sem,
+}
+
+
+def _render(gen):
+    return gen_cal.serialize(gen()).encode()
+
+
+class GoldenOutputTest(unittest.TestCase):
+    def test_matches_golden(self):
+        for filename, gen in GOLDEN.items():
+            with self.subTest(filename):
+                with open(os.path.join(GOLDEN_DIR, filename), "rb") as f:
+                    self.assertEqual(_render(gen), f.read())
+
+    def test_write_calendar_matches_serialize(self):
+        import io
+
+        buf = io.StringIO(newline="")
+        gen_cal.write_calendar(buf, gen_cal.iter_first_sem())
+        self.assertEqual(buf.getvalue(), gen_cal.serialize(gen_cal.gen_first_sem()))
+
+    def test_uids_unique_across_semesters(self):
+        text = "".join(gen_cal.serialize(gen()) for gen in GOLDEN.values())
+        uids = [line for line in text.split("\r\n") if line.startswith("UID:")]
+        self.assertEqual(len(uids), len(set(uids)))
+
+
+class FormatTest(unittest.TestCase):
+    def test_fmt_duration(self):
+        cases = {
+            timedelta(hours=3): "PT3H",
+            timedelta(hours=-1): "-PT1H",
+            timedelta(days=-7): "-P7D",
+            timedelta(minutes=90): "PT1H30M",
+            timedelta(0): "PT0S",
+        }
+        for td, expected in cases.items():
+            with self.subTest(td=td):
+                self.assertEqual(gen_cal._fmt_duration(td), expected)
+
+    def test_escape(self):
+        self.assertEqual(gen_cal._escape("a\\b;c,d\ne"), "a\\\\b\\;c\\,d\\ne")
+
+    def test_fmt_dtstart_timed_is_utc(self):
+        dt = datetime(2023, 7, 25, 15, 30, tzinfo=gen_cal.SGT)
+        self.assertEqual(gen_cal._fmt_dtstart(dt, False), "DTSTART:20230725T073000Z\r\n")
+
+    def test_fmt_dtstart_all_day_uses_local_date(self):
+        self.assertEqual(
+            gen_cal._fmt_dtstart(date(2023, 8, 29), True), "DTSTART;VALUE=DATE:20230829\r\n"
+        )
+        # The same instant in two zones falls on different dates; the result
+        # must not depend on which one was formatted first.
+        sgt = datetime(2023, 8, 29, 0, 30, tzinfo=gen_cal.SGT)
+        utc = sgt.astimezone(timezone.utc)
+        self.assertEqual(gen_cal._fmt_dtstart(utc, True), "DTSTART;VALUE=DATE:20230828\r\n")
+        self.assertEqual(gen_cal._fmt_dtstart(sgt, True), "DTSTART;VALUE=DATE:20230829\r\n")
+
+
+def regen():
+    os.makedirs(GOLDEN_DIR, exist_ok=True)
+    for filename, gen in GOLDEN.items():
+        with open(os.path.join(GOLDEN_DIR, filename), "wb") as f:
+            f.write(_render(gen))
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["regen"]:
+        regen()
+    else:
+        unittest.main()